@@ -6,14 +6,20 @@ and [I-D.ietf-core-yang-library] for more information.
 
 """
 
+import bisect
+import itertools
 import optparse
 import sys
-import collections
-import re
 import os
 import errno
 import json
 from json import JSONDecodeError
+from operator import itemgetter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 from pyang import plugin
@@ -60,6 +66,10 @@ class SidPlugin(plugin.PyangPlugin):
                                  type="string",
                                  dest="extra_sid_range",
                                  help="Add an extra SID range during a .sid file update."),
+            optparse.make_option("--sid-compact",
+                                 action="store_true",
+                                 dest="compact_sid_file",
+                                 help="Generate the .sid file without indentation."),
             ]
 
         g = optparser.add_option_group("SID file specific options")
@@ -87,10 +97,8 @@ class SidPlugin(plugin.PyangPlugin):
             sys.stderr.write("Invalid option, only one process on .sid file can be requested.\n")
             return
 
-        fatal_error = False
-        for _, etag, _ in ctx.errors:
-            if not error.is_warning(error.err_level(etag)):
-                fatal_error = True
+        fatal_error = any(not error.is_warning(error.err_level(etag))
+                          for _, etag, _ in ctx.errors)
 
         if fatal_error or ctx.errors and ctx.opts.check_sid_file is not None:
             sys.stderr.write("Invalid YANG module\n")
@@ -126,6 +134,9 @@ class SidPlugin(plugin.PyangPlugin):
         if ctx.opts.list_sid:
             sid_file.list_content = True
 
+        if ctx.opts.compact_sid_file:
+            sid_file.compact = True
+
         try:
             sid_file.process_sid_file(modules[0])
 
@@ -257,13 +268,17 @@ class SidFile:
         self.is_consistent = True
         self.check_consistency = False
         self.list_content = False
+        self.compact = False
         self.sid_registration_info = False
         self.input_file_name = None
         self.range = None
         self.extra_range = None
         self.count = False
         self.node_highest = 0
-        self.content = collections.OrderedDict()
+        self.content = {}
+        self.item_index = {}
+        self.path_cache = {}
+        self.used_sids = set()
         self.module_name = ''
         self.module_revision = ''
         self.output_file_name = ''
@@ -283,11 +298,27 @@ class SidFile:
             if not self.input_file_name.endswith(".sid"):
                 raise SidParsingError("File '%s' is not a .sid file" % self.input_file_name)
 
-            with open(self.input_file_name) as f:
-                self.content = json.load(f, object_pairs_hook=collections.OrderedDict)
+            # Read the file in one shot and hand the parser a single
+            # in-memory blob; both parsers accept UTF-8 encoded bytes.
+            with open(self.input_file_name, 'rb') as f:
+                data = f.read()
+            if orjson is not None:
+                try:
+                    self.content = orjson.loads(data)
+                except ValueError:
+                    # Re-parse with the stdlib for a consistent error message.
+                    self.content = json.loads(data)
+            else:
+                self.content = json.loads(data)
             # Upgrades can be removed after a reasonable transition period.
             self.upgrade_sid_file_format()
             self.validate_key_and_value()
+            # Namespaces repeat one of four values and identifiers are
+            # looked up again during the merge; intern both so the
+            # comparisons and hashing work on shared objects.
+            for item in self.content['items']:
+                item['namespace'] = sys.intern(item['namespace'])
+                item['identifier'] = sys.intern(item['identifier'])
             self.validate_overlapping_ranges()
             self.validate_sid()
 
@@ -355,16 +386,14 @@ class SidFile:
 
     ########################################################
     def set_sid_range(self, srange):
-        match = re.match(r'^(\d+):(\d+)$', srange)
-        if not match:
+        entry_point, sep, size = srange.partition(':')
+        if not sep or not entry_point.isdecimal() or not size.isdecimal():
             raise SidParsingError("invalid range in argument, must be '<entry-point>:<size>'.")
-        components = match.groups()
 
         aranges = self.content.get('assignment-ranges')
         if aranges is None:
             self.content['assignment-ranges'] = aranges = []
-        aranges.append(collections.OrderedDict(
-            [('entry-point', int(components[0])), ('size', int(components[1]))]))
+        aranges.append({'entry-point': int(entry_point), 'size': int(size)})
 
     ########################################################
     # Set the 'module-name' and/or 'module-revision' in the .sid file if they differ
@@ -386,106 +415,75 @@ class SidFile:
     ########################################################
     # Verify the tag and data type of each .sid file JSON object
     def validate_key_and_value(self):
-        assignment_ranges_absent = True
-        module_name_absent = True
-        module_revision_absent = True
-        items_absent = True
-
-        for key in self.content:
+        for key, value in self.content.items():
             if key == 'assignment-ranges':
-                assignment_ranges_absent = False
-                if not isinstance(self.content[key], list):
+                if not isinstance(value, list):
                     raise SidFileError("key 'assignment-ranges', invalid  value.")
-                self.validate_ranges(self.content[key])
-
-            elif key == 'module-name':
-                module_name_absent = False
-
-            elif key == 'module-revision':
-                module_revision_absent = False
+                self.validate_ranges(value)
 
             elif key == 'items':
-                items_absent = False
-                if not isinstance(self.content[key], list):
+                if not isinstance(value, list):
                     raise SidFileError("key 'items', invalid value.")
-                self.validate_items(self.content[key])
+                self.validate_items(value)
 
-            else:
+            elif key not in {'module-name', 'module-revision'}:
                 raise SidFileError("invalid field '%s'." % key)
 
-        if module_name_absent:
-            raise SidFileError("mandatory field 'module-name' not present")
-
-        if module_revision_absent:
-            raise SidFileError("mandatory field 'module-revision' not present")
-
-        if assignment_ranges_absent:
-            raise SidFileError("mandatory field 'assignment-ranges' not present")
-
-        if items_absent:
-            raise SidFileError("mandatory field 'items' not present")
+        for field in ('module-name', 'module-revision', 'assignment-ranges', 'items'):
+            if field not in self.content:
+                raise SidFileError("mandatory field '%s' not present" % field)
 
     @staticmethod
     def validate_ranges(ranges):
-        entry_point_absent = True
-        size_absent = True
+        int_types = util.int_types
+        seen = set()
 
         for arange in ranges:
-            for key in arange:
+            for key, value in arange.items():
                 if key == 'entry-point':
-                    entry_point_absent = False
-                    if not isinstance(arange[key], util.int_types):
-                        raise SidFileError("invalid 'entry-point' value '%s'." % arange[key])
+                    if not isinstance(value, int_types):
+                        raise SidFileError("invalid 'entry-point' value '%s'." % value)
 
                 elif key == 'size':
-                    size_absent = False
-                    if not isinstance(arange[key], util.int_types):
-                        raise SidFileError("invalid 'size' value '%s'." % arange[key])
+                    if not isinstance(value, int_types):
+                        raise SidFileError("invalid 'size' value '%s'." % value)
 
                 else:
                     raise SidFileError("invalid key '%s'." % key)
+                seen.add(key)
 
-        if entry_point_absent:
-            raise SidFileError("mandatory field 'entry-point' not present")
-
-        if size_absent:
-            raise SidFileError("mandatory field 'size' not present")
+        for field in ('entry-point', 'size'):
+            if field not in seen:
+                raise SidFileError("mandatory field '%s' not present" % field)
 
-    namespace_ends = ('module', 'identity', 'feature', 'data')
+    namespaces = frozenset(('module', 'identity', 'feature', 'data'))
 
     def validate_items(self, items):
-        namespace_absent = True
-        identifier_absent = True
-        sid_absent = True
+        namespaces = self.namespaces
+        int_types = util.int_types
+        seen = set()
+
         for item in items:
-            for key in item:
+            for key, value in item.items():
                 if key == 'namespace':
-                    namespace_absent = False
-                    if not (isinstance(item[key], str)
-                            and item[key].endswith(self.namespace_ends)):
-                        raise SidFileError("invalid 'namespace' value '%s'." % item[key])
+                    if not (isinstance(value, str) and value in namespaces):
+                        raise SidFileError("invalid 'namespace' value '%s'." % value)
 
                 elif key == 'identifier':
-                    identifier_absent = False
-                    if not isinstance(item[key], str):
-                        raise SidFileError("invalid 'identifier' value '%s'." % item[key])
+                    if not isinstance(value, str):
+                        raise SidFileError("invalid 'identifier' value '%s'." % value)
 
                 elif key == 'sid':
-                    sid_absent = False
-                    if not isinstance(item[key], util.int_types):
-                        raise SidFileError("invalid 'sid' value '%s'." % item[key])
+                    if not isinstance(value, int_types):
+                        raise SidFileError("invalid 'sid' value '%s'." % value)
 
                 else:
                     raise SidFileError("invalid key '%s'." % key)
+                seen.add(key)
 
-        if namespace_absent:
-            raise SidFileError("mandatory field 'namespace' not present")
-
-        if identifier_absent:
-            raise SidFileError("mandatory field 'identifier' not present")
-
-        if sid_absent:
-            raise SidFileError("mandatory field 'sid' not present")
+        for field in ('namespace', 'identifier', 'sid'):
+            if field not in seen:
+                raise SidFileError("mandatory field '%s' not present" % field)
 
     ########################################################
     # Verify if each range defined in the .sid file is distinct
@@ -493,43 +491,47 @@ class SidFile:
         assignment_ranges = self.content.get('assignment-ranges')
         if not assignment_ranges:
             return
-        used = []
 
-        for arange in assignment_ranges:
+        # Sort a copy by entry point, then a single sweep finds any overlap.
+        previous_high = -1
+        for arange in sorted(assignment_ranges, key=lambda arange: arange['entry-point']):
             low = arange['entry-point']
-            high = low + arange['size']
-
-            for used_low, used_high in used:
-                if used_low <= low < used_high or low <= used_low < high:
-                    raise SidFileError("overlapping ranges are not allowed.")
-            used.append((low, high))
+            if low < previous_high:
+                raise SidFileError("overlapping ranges are not allowed.")
+            previous_high = low + arange['size']
 
     ########################################################
     # Verify if each SID listed in items is in range and is not duplicate.
     def validate_sid(self):
-        self.content['items'].sort(key=lambda item: item['sid'])
+        get_sid = itemgetter('sid')
+        items = self.content['items']
+        sids = [get_sid(item) for item in items]
+        # Files written by previous runs are already sorted by sid;
+        # only pay for the sort when they are not.
+        if any(sids[i] < sids[i - 1] for i in range(1, len(sids))):
+            items.sort(key=get_sid)
+            sids.sort()
+
+        sorted_ranges = sorted((arange['entry-point'], arange['entry-point'] + arange['size'])
+                               for arange in self.content.get('assignment-ranges') or ())
+        starts = [low for low, _ in sorted_ranges]
+
         last_sid = -1
-        for item in self.content['items']:
-            sid = item['sid']
-            if self.out_of_ranges(sid):
+        for sid in sids:
+            idx = bisect.bisect_right(starts, sid) - 1
+            if idx < 0 or sid >= sorted_ranges[idx][1]:
                 raise SidFileError("'sid' %d not within 'assignment-ranges'" % sid)
             if sid == last_sid:
                 raise SidFileError("duplicated 'sid' value %d " % sid)
             last_sid = sid
 
-    def out_of_ranges(self, sid):
-        for arange in self.content.get('assignment-ranges') or []:
-            if arange['entry-point'] <= sid < arange['entry-point'] + arange['size']:
-                return False
-        return True
-
     # Groups of keywords with same handling in some method below, named after a representative
-    leaf_keywords = ('leaf', 'leaf-list', 'anyxml', 'anydata')
-    container_keywords = ('container', 'list')
-    choice_keywords = ('choice', 'case')
-    inrpc_keywords = ('input', 'output')
-    grouping_keywords = ('grouping', 'choice', 'case')
-    module_keywords = ('module', 'container', 'list', 'notification', 'rpc', 'action')
+    leaf_keywords = frozenset(('leaf', 'leaf-list', 'anyxml', 'anydata'))
+    container_keywords = frozenset(('container', 'list'))
+    choice_keywords = frozenset(('choice', 'case'))
+    inrpc_keywords = frozenset(('input', 'output'))
+    grouping_keywords = frozenset(('grouping', 'choice', 'case'))
+    module_keywords = frozenset(('module', 'container', 'list', 'notification', 'rpc', 'action'))
 
     @staticmethod
     def has_yang_data_extension(statement):
@@ -544,14 +546,22 @@ class SidFile:
         if 'items' not in self.content:
             self.content['items'] = []
 
+        # Index the items by namespace and identifier for merge_item,
+        # and record which SIDs are already taken.
+        self.item_index = {}
+        self.path_cache = {}
+        self.used_sids = set()
         for item in self.content['items']:
             item['status'] = 'd' # Set to 'd' deleted, updated to 'o' if present in .yang file
+            self.item_index[(item['namespace'], item['identifier'])] = item
+            if item['sid'] != -1:
+                self.used_sids.add(item['sid'])
 
         self.merge_item('module', self.module_name)
 
-        for name in module.i_ctx.modules:
-            if module.i_ctx.modules[name].keyword == 'submodule':
-                self.merge_item('module', module.i_ctx.modules[name].arg)
+        for ctx_module in module.i_ctx.modules.values():
+            if ctx_module.keyword == 'submodule':
+                self.merge_item('module', ctx_module.arg)
 
         for feature in module.i_features:
             self.merge_item('feature', feature)
@@ -587,26 +597,31 @@ class SidFile:
                 self.collect_in_substmts(substmt.substmts)
 
     def collect_inner_data_nodes(self, statements, prefix=""):
-        for statement in statements:
-            if statement.keyword in self.leaf_keywords:
-                self.merge_item('data', self.get_path(statement, prefix))
-
-            elif statement.keyword in self.container_keywords:
-                self.merge_item('data', self.get_path(statement, prefix))
-                self.collect_inner_data_nodes(statement.i_children, prefix)
-
-            elif statement.keyword == 'action':
-                self.merge_item('data', self.get_path(statement, prefix))
-                for substmt in statement.i_children:
-                    if substmt.keyword in self.inrpc_keywords:
-                        self.collect_inner_data_nodes(substmt.i_children, prefix)
-
-            elif statement.keyword == 'notification':
-                self.merge_item('data', self.get_path(statement, prefix))
-                self.collect_inner_data_nodes(statement.i_children, prefix)
-
-            elif statement.keyword in self.choice_keywords:
-                self.collect_inner_data_nodes(statement.i_children, prefix)
+        # Depth-first walk over an explicit stack of child lists;
+        # recursion frames add up on deep schema trees.
+        stack = [statements]
+        while stack:
+            for statement in stack.pop():
+                keyword = statement.keyword
+                if keyword in self.leaf_keywords:
+                    self.merge_item('data', self.get_path(statement, prefix))
+
+                elif keyword in self.container_keywords:
+                    self.merge_item('data', self.get_path(statement, prefix))
+                    stack.append(statement.i_children)
+
+                elif keyword == 'action':
+                    self.merge_item('data', self.get_path(statement, prefix))
+                    for substmt in statement.i_children:
+                        if substmt.keyword in self.inrpc_keywords:
+                            stack.append(substmt.i_children)
+
+                elif keyword == 'notification':
+                    self.merge_item('data', self.get_path(statement, prefix))
+                    stack.append(statement.i_children)
+
+                elif keyword in self.choice_keywords:
+                    stack.append(statement.i_children)
 
     def collect_in_substmts(self, substmts):
         for statement in substmts:
@@ -625,42 +640,55 @@ class SidFile:
                 self.collect_inner_data_nodes(statement.i_grouping.i_children, prefix)
 
     def get_path(self, statement, prefix=""):
-        path = ""
-
-        while statement.i_module is not None:
-            if (statement.keyword not in self.grouping_keywords
-                    and not self.has_yang_data_extension(statement)):
-                # Locate the data node parent
-                parent = statement.parent
-                while parent.i_module is not None:
-                    if parent.keyword in self.module_keywords:
-                        break
-                    parent = parent.parent
-
-                if (prefix != "" or
-                    (parent.i_module is not None and parent.i_module == statement.i_module)):
-                    path = "/" + statement.arg + path
-                else:
-                    path = "/" + statement.i_module.arg + ":" + statement.arg + path
-
-            statement = statement.parent
+        # Built bottom-up so the path of every ancestor is computed and
+        # cached at most once per run.
+        if statement.i_module is None:
+            return prefix
+
+        key = (id(statement), prefix)
+        path = self.path_cache.get(key)
+        if path is not None:
+            return path
+
+        path = self.get_path(statement.parent, prefix)
+        if (statement.keyword not in self.grouping_keywords
+                and not self.has_yang_data_extension(statement)):
+            # Locate the data node parent
+            parent = statement.parent
+            while parent.i_module is not None:
+                if parent.keyword in self.module_keywords:
+                    break
+                parent = parent.parent
+
+            if (prefix != "" or
+                (parent.i_module is not None and parent.i_module == statement.i_module)):
+                path += "/" + statement.arg
+            else:
+                path += "/" + statement.i_module.arg + ":" + statement.arg
 
-        return prefix + path
+        self.path_cache[key] = path
+        return path
 
     def merge_item(self, namespace, identifier):
-        for item in self.content['items']:
-            if (namespace == item['namespace'] and identifier == item['identifier']):
-                item['status'] = 'o' # Item already assigned
-                return
-        self.content['items'].append(collections.OrderedDict(
-            [('namespace', namespace), ('identifier', identifier), ('sid', -1), ('status', 'n')]))
+        identifier = sys.intern(identifier)
+        item = self.item_index.get((namespace, identifier))
+        if item is not None:
+            item['status'] = 'o' # Item already assigned
+            return
+        item = {'namespace': namespace, 'identifier': identifier, 'sid': -1, 'status': 'n'}
+        self.content['items'].append(item)
+        self.item_index[(namespace, identifier)] = item
         self.is_consistent = False
 
+    # Rank of each namespace in the listing order (descending string order)
+    namespace_order = {'module': 0, 'identity': 1, 'feature': 2, 'data': 3}
+
     ########################################################
     # Sort the items list by 'namespace' and 'identifier'
     def sort_items(self):
-        self.content['items'].sort(key=lambda item: item['identifier'])
-        self.content['items'].sort(key=lambda item: item['namespace'], reverse=True)
+        namespace_order = self.namespace_order
+        self.content['items'].sort(
+            key=lambda item: (namespace_order[item['namespace']], item['identifier']))
 
     ########################################################
     # Identifier assignment
@@ -669,61 +697,49 @@ class SidFile:
         unassigned = [item for item in items if item['sid'] == -1]
         if not unassigned:
             return
-        used = sorted(item['sid'] for item in items if item['sid'] != -1)
+        used = sorted(self.used_sids)
         needed = len(unassigned)
-        source = self.gen_sids(used)
-
-        for item in unassigned:
-            try:
-                item['sid'] = next(source)
-            except StopIteration:
-                raise SidParsingError(
-                    "The current SID range(s) are exhausted, %d extra SID(s) "
-                    "are required, use the --sid-extra-range option to add "
-                    "a SID range to this YANG module." % needed)
-            needed -= 1
+        sids = list(itertools.islice(self.gen_sids(used), needed))
+
+        if len(sids) < needed:
+            raise SidParsingError(
+                "The current SID range(s) are exhausted, %d extra SID(s) "
+                "are required, use the --sid-extra-range option to add "
+                "a SID range to this YANG module." % (needed - len(sids)))
+
+        for item, sid in zip(unassigned, sids):
+            item['sid'] = sid
+            self.used_sids.add(sid)
 
     def sid_used(self, sid):
-        for item in self.content['items']:
-            if item['sid'] == sid:
-                return True
-        return False
+        return sid in self.used_sids
 
     def gen_sids(self, used):
         ranges = sorted((arange['entry-point'], arange['size'])
-                        for arange in self.content.get('assignment-ranges') or [])
-        used_idx = 0
-        used_len = len(used)
-        for sid, size in ranges:
-            high = sid + size
-            while sid < high:
-                # find next upper bound of unused sids above sid
-                while used_idx < used_len:
-                    stop = used[used_idx]
-                    if stop < sid:
-                        used_idx += 1
-                    else:
-                        if stop == sid:
-                            # go past the used sid, recheck sid < high
-                            sid += 1
-                        elif stop > high:
-                            # next used is above current range
-                            stop = high
-                        break
-                else:
-                    # no more used sids
-                    stop = high
-
-                while sid < stop:
-                    yield sid
-                    sid += 1
+                        for arange in self.content.get('assignment-ranges') or ())
+        for entry_point, size in ranges:
+            high = entry_point + size
+            gap_low = entry_point
+
+            # yield the gaps between the used sids falling in this range
+            low_idx = bisect.bisect_left(used, entry_point)
+            high_idx = bisect.bisect_left(used, high)
+            for sid in used[low_idx:high_idx]:
+                if gap_low < sid:
+                    yield from range(gap_low, sid)
+                gap_low = sid + 1
+
+            if gap_low < high:
+                yield from range(gap_low, high)
 
     ########################################################
     def list_all_items(self):
         definition_removed = False
 
-        print("\nSID        Assigned to")
-        print("---------  --------------------------------------------------")
+        lines = [
+            "\nSID        Assigned to",
+            "---------  --------------------------------------------------",
+        ]
         for item in self.content['items']:
             status = ""
             if item['status'] == 'n' and not self.sid_file_created:
@@ -732,25 +748,26 @@ class SidFile:
                 status = " (Remove)"
                 definition_removed = True
 
-            print("%-9s  %s %s%s" % (item['sid'], item['namespace'], item['identifier'], status))
+            lines.append("%-9s  %s %s%s" % (item['sid'], item['namespace'],
+                                            item['identifier'], status))
 
         if definition_removed:
-            print(
+            lines.append(
                 "\nWARNING, obsolete definitions should be defined as 'deprecated' or 'obsolete'.")
 
+        print('\n'.join(lines))
+
     ########################################################
     def list_deleted_items(self):
-        definition_removed = False
-        for item in self.content['items']:
-            if item['status'] == 'd':
-                print("WARNING, item '%s' was deleted form the .yang files." % item['identifier'])
-                definition_removed = True
+        lines = ["WARNING, item '%s' was deleted form the .yang files." % item['identifier']
+                 for item in self.content['items'] if item['status'] == 'd']
 
-        if definition_removed:
-            print("Obsolete definitions MUST NOT be removed "
-                  "from YANG modules, see RFC 6020 section 10.\n"
-                  "These definition(s) should be reintroduced "
-                  "with a 'deprecated' or 'obsolete' status.")
+        if lines:
+            lines.append("Obsolete definitions MUST NOT be removed "
+                         "from YANG modules, see RFC 6020 section 10.\n"
+                         "These definition(s) should be reintroduced "
+                         "with a 'deprecated' or 'obsolete' status.")
+            print('\n'.join(lines))
 
     ########################################################
     def generate_file(self):
@@ -760,26 +777,31 @@ class SidFile:
         if os.path.exists(self.output_file_name):
             os.remove(self.output_file_name)
 
-        with open(self.output_file_name, 'w') as outfile:
-            json.dump(self.content, outfile, indent=2)
+        if self.compact:
+            text = json.dumps(self.content, separators=(',', ':'), ensure_ascii=False)
+        else:
+            text = json.dumps(self.content, indent=2, ensure_ascii=False)
+
+        with open(self.output_file_name, 'w', encoding='utf-8') as outfile:
+            outfile.write(text)
 
     ########################################################
     def number_of_sids_allocated(self):
         size = 0
-        for arange in self.content.get('assignment-ranges') or []:
+        for arange in self.content.get('assignment-ranges') or ():
             size += arange['size']
         return size
 
     def number_of_unassigned_yang_items(self):
-        return len([0 for item in self.content['items'] if item['sid'] == -1])
+        return sum(1 for item in self.content['items'] if item['sid'] == -1)
 
     def number_of_sids_used(self):
-        return len([0 for item in self.content['items'] if item['sid'] != -1])
+        return sum(1 for item in self.content['items'] if item['sid'] != -1)
 
     def number_of_sids_used_in_range(self, entry_point, size):
         low = entry_point
         high = low + size
-        return len([0 for item in self.content['items'] if low <= item['sid'] < high])
+        return sum(1 for item in self.content['items'] if low <= item['sid'] < high)
 
     ########################################################
     def print_registration_information(self, module):
@@ -793,15 +815,14 @@ class SidFile:
             'submodules' : submodules,
         }
 
-        for arange in self.content('assignment-ranges') or []:
+        for arange in self.content.get('assignment-ranges') or ():
             ranges.append({
                 'entry_point' : arange['entry-point'],
                 'size' : arange['size'],
                 'used' : self.number_of_sids_used_in_range(arange['entry-point'], arange['size'])
             })
 
-        for name in module.i_ctx.modules:
-            submodule = module.i_ctx.modules[name]
+        for submodule in module.i_ctx.modules.values():
             if submodule.keyword == 'submodule':
                 submodules.append('%s@%s.yang' % (submodule.arg, submodule.i_latest_revision))
 
@@ -811,13 +832,18 @@ class SidFile:
     # Perform the conversion to the .sid file fromat introduced by [I-D.ietf-core-sid] version 3.
     # This method can be removed after the proper transition period.
 
-    node_keywords = ('node', 'notification', 'rpc', 'action')
+    node_keywords = frozenset(('node', 'notification', 'rpc', 'action'))
 
     def upgrade_sid_file_format(self):
         items = self.content.get('items')
         if not items:
             return
 
+        # Files already in the current format carry no legacy keys;
+        # skip the per-item rewrite pass for them.
+        if not any('type' in item or 'label' in item for item in items):
+            return
+
         for item in items:
             type_ = item.pop('type', None)
             label = item.pop('label', None)